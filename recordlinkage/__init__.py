@@ -4,6 +4,7 @@
 from recordlinkage.indexing import *
 from recordlinkage.comparing import *
 from recordlinkage.classifiers import *
+from recordlinkage.fuse import *
 from recordlinkage.measures import *
 
 from recordlinkage import rl_logging as logging
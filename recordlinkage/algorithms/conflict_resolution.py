@@ -0,0 +1,513 @@
+"""Conflict resolution functions for data fusion.
+
+This module contains the conflict resolution functions used by the fusion
+classes in :mod:`recordlinkage.fuse`. Each function resolves a conflict
+between the values of two (or more) linked records into a single canonical
+value.
+
+Two flavours are available. The row-wise functions take a nested tuple
+``x = (values, metadata)`` for a single record pair and are applied with
+``pandas.Series.apply``. The vectorized functions (suffixed with ``_vec``)
+take the values and metadata of all record pairs at once, as 2-D numpy
+arrays of shape ``(n_pairs, n_columns)``, and resolve all conflicts in a
+single numpy/pandas operation. Vectorized functions are marked with the
+``vectorized`` attribute, on which ``FuseCore.resolve`` dispatches.
+"""
+
+from __future__ import division
+
+import collections
+import random
+
+import numpy as np
+import pandas
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# maximum number of columns for the compiled majority vote kernel
+_VOTE_MAX_COLUMNS = 32
+
+
+if numba is not None:
+
+    # nopython but not parallel: numba's threading layer is not
+    # fork-safe and a parallel kernel would deadlock the fork-based
+    # multiprocessing pool used by FuseCore for n_jobs > 1
+    @numba.njit
+    def _vote_codes(codes):
+        """Majority vote per row on a dictionary-encoded matrix.
+
+        Missing values are encoded as negative codes and ignored. The
+        codes follow the sort order of the values, so ties are broken
+        by the smallest code. Returns -1 for rows without valid codes.
+        """
+
+        n_rows, n_cols = codes.shape
+        winners = np.empty(n_rows, dtype=np.int64)
+
+        for i in range(n_rows):
+
+            best_code = -1
+            best_count = 0
+
+            for j in range(n_cols):
+
+                code = codes[i, j]
+
+                if code < 0:
+                    continue
+
+                count = 0
+                for m in range(n_cols):
+                    if codes[i, m] == code:
+                        count += 1
+
+                if count > best_count or \
+                        (count == best_count and code < best_code):
+                    best_code = code
+                    best_count = count
+
+            winners[i] = best_code
+
+        return winners
+
+
+def vectorized(fun):
+    """Mark a conflict resolution function as vectorized.
+
+    Vectorized functions accept two 2-D numpy arrays (values and metadata
+    of all record pairs) instead of one nested tuple per record pair.
+    """
+
+    fun.vectorized = True
+
+    return fun
+
+
+def remove_missing(values):
+    """Remove the missing values from a tuple of values."""
+
+    return [val for val in values if not pandas.isnull(val)]
+
+
+# ---------------------------------------------------------------------------
+# Row-wise conflict resolution functions. These are used as reference
+# implementations and as the fallback for user defined resolution functions
+# applied with pandas.Series.apply.
+# ---------------------------------------------------------------------------
+
+def choose_max(x):
+    """Choose the largest value.
+
+    Missing values are ignored. If all values are missing, the result is
+    missing as well.
+    """
+
+    values = remove_missing(x[0])
+
+    if not values:
+        return np.nan
+
+    return max(values)
+
+
+def choose_min(x):
+    """Choose the smallest value.
+
+    Missing values are ignored. If all values are missing, the result is
+    missing as well.
+    """
+
+    values = remove_missing(x[0])
+
+    if not values:
+        return np.nan
+
+    return min(values)
+
+
+def vote(x):
+    """Choose the most common value.
+
+    Missing values are ignored. Ties are broken by choosing the smallest
+    of the most common values.
+    """
+
+    values = remove_missing(x[0])
+
+    if not values:
+        return np.nan
+
+    counts = collections.Counter(values)
+    max_count = max(counts.values())
+
+    return min([val for val, n in counts.items() if n == max_count])
+
+
+def no_gossip(x):
+    """Choose the value on which all sources agree.
+
+    If the values disagree, or if one of the values is missing, the result
+    is missing.
+    """
+
+    values = x[0]
+
+    for val in values:
+        if pandas.isnull(val):
+            return np.nan
+
+    for val in values:
+        if val != values[0]:
+            return np.nan
+
+    return values[0]
+
+
+def choose_random(x):
+    """Choose a random value.
+
+    Missing values are excluded from the draw. If all values are missing,
+    the result is missing as well.
+    """
+
+    values = remove_missing(x[0])
+
+    if not values:
+        return np.nan
+
+    return random.choice(values)
+
+
+def count(x):
+    """Count the number of unique non-missing values."""
+
+    return len(set(remove_missing(x[0])))
+
+
+def choose(x, trusted):
+    """Choose the first non-missing value of a trusted source.
+
+    The metadata of each value holds the identifier of its source. The
+    first value with metadata equal to ``trusted`` is returned.
+    """
+
+    values, meta = x
+
+    for val, source in zip(values, meta):
+        if source == trusted and not pandas.isnull(val):
+            return val
+
+    return np.nan
+
+
+def choose_metadata_max(x):
+    """Choose the value with the largest metadata value.
+
+    Values with missing metadata are ignored. Useful to select the most
+    recent value by passing dates as metadata.
+    """
+
+    values, meta = x
+
+    best_val = np.nan
+    best_meta = None
+
+    for val, meta_val in zip(values, meta):
+
+        if pandas.isnull(val) or pandas.isnull(meta_val):
+            continue
+
+        if best_meta is None or meta_val > best_meta:
+            best_val = val
+            best_meta = meta_val
+
+    return best_val
+
+
+def choose_metadata_min(x):
+    """Choose the value with the smallest metadata value."""
+
+    values, meta = x
+
+    best_val = np.nan
+    best_meta = None
+
+    for val, meta_val in zip(values, meta):
+
+        if pandas.isnull(val) or pandas.isnull(meta_val):
+            continue
+
+        if best_meta is None or meta_val < best_meta:
+            best_val = val
+            best_meta = meta_val
+
+    return best_val
+
+
+# ---------------------------------------------------------------------------
+# Vectorized conflict resolution functions. These functions resolve all
+# record pairs in one call on 2-D numpy arrays and replace the row-wise
+# functions above on the hot path.
+# ---------------------------------------------------------------------------
+
+def _mask_missing(values, missing):
+    """Set the masked entries of a resolved column to a missing value.
+
+    numpy cannot promote datetime64/timedelta64 (or fixed-width string)
+    values against a float NaN, so the missing marker is chosen to fit
+    the dtype: NaT for datetime-like values, NaN for everything else
+    (boxing the values to object dtype where needed).
+    """
+
+    if not missing.any():
+        return values
+
+    kind = values.dtype.kind
+
+    if kind in 'mM':
+        return np.where(missing, values.dtype.type('NaT'), values)
+
+    if kind in 'USV':
+        values = values.astype(object)
+
+    return np.where(missing, np.nan, values)
+
+
+def _as_float_matrix(vals):
+    """Return the values as a float64 matrix, or None.
+
+    Only dtypes whose missing values survive the conversion as NaN may
+    take the float-with-NaN path: float itself and object arrays that
+    convert cleanly. Converting datetime64/timedelta64 would silently
+    turn NaT into a huge negative integer and converting int64 loses
+    precision above 2**53, so such values (and string dtypes, which do
+    not convert at all) return None.
+    """
+
+    if vals.dtype == object:
+        try:
+            return vals.astype(np.float64)
+        except (TypeError, ValueError):
+            return None
+
+    if vals.dtype.kind == 'f':
+        return vals.astype(np.float64, copy=False)
+
+    return None
+
+
+@vectorized
+def choose_max_vec(vals, meta=None):
+    """Choose the largest value for each record pair.
+
+    Vectorized version of :func:`choose_max`.
+    """
+
+    if vals.dtype.kind in 'biu':
+        # integer and boolean matrices cannot hold missing values;
+        # reduce on the native dtype to avoid float precision loss
+        return np.max(vals, axis=1)
+
+    values = _as_float_matrix(vals)
+
+    if values is None:
+        # non-numeric values, reduce per row with pandas which skips
+        # missing values (including NaT) and compares any orderable type
+        return pandas.DataFrame(vals).max(axis=1).to_numpy()
+
+    missing = np.isnan(values)
+    all_missing = missing.all(axis=1)
+
+    result = np.max(np.where(missing, -np.inf, values), axis=1)
+    result[all_missing] = np.nan
+
+    return result
+
+
+@vectorized
+def choose_min_vec(vals, meta=None):
+    """Choose the smallest value for each record pair.
+
+    Vectorized version of :func:`choose_min`.
+    """
+
+    if vals.dtype.kind in 'biu':
+        return np.min(vals, axis=1)
+
+    values = _as_float_matrix(vals)
+
+    if values is None:
+        return pandas.DataFrame(vals).min(axis=1).to_numpy()
+
+    missing = np.isnan(values)
+    all_missing = missing.all(axis=1)
+
+    result = np.min(np.where(missing, np.inf, values), axis=1)
+    result[all_missing] = np.nan
+
+    return result
+
+
+@vectorized
+def vote_vec(vals, meta=None):
+    """Choose the most common value for each record pair.
+
+    Vectorized version of :func:`vote`. Ties are broken by choosing the
+    smallest of the most common values. When numba is installed, the
+    values are dictionary-encoded with pandas.factorize and tallied by
+    a compiled kernel, which is much faster than the pandas mode path
+    for wide string data.
+    """
+
+    if numba is not None and vals.shape[1] <= _VOTE_MAX_COLUMNS:
+
+        try:
+            codes, uniques = pandas.factorize(vals.ravel(), sort=True)
+        except TypeError:
+            # unorderable mixed values, use the pandas mode path
+            codes = None
+
+        if codes is not None:
+
+            codes = codes.astype(np.int64).reshape(vals.shape)
+            winners = _vote_codes(codes)
+            found = winners >= 0
+
+            if not found.any():
+                return np.full(vals.shape[0], np.nan, dtype=object)
+
+            # gather on the clipped codes and blank the rows without
+            # valid values; keeps the dtype of the factorized uniques
+            result = np.asarray(uniques).take(np.where(found, winners, 0))
+
+            return _mask_missing(result, ~found)
+
+    modes = pandas.DataFrame(vals).mode(axis=1)
+
+    if modes.shape[1] == 0:
+        return np.full(vals.shape[0], np.nan, dtype=object)
+
+    return modes.iloc[:, 0].to_numpy()
+
+
+@vectorized
+def no_gossip_vec(vals, meta=None):
+    """Choose the value on which all sources agree, for each record pair.
+
+    Vectorized version of :func:`no_gossip`.
+    """
+
+    agree = (vals == vals[:, :1]).all(axis=1)
+    any_missing = pandas.isnull(vals).any(axis=1)
+
+    return _mask_missing(vals[:, 0], ~agree | any_missing)
+
+
+@vectorized
+def choose_random_vec(vals, meta=None, rng=None):
+    """Choose a random value for each record pair.
+
+    Vectorized version of :func:`choose_random`. A single bulk draw
+    replaces the per-pair calls into the random module. Pass a seeded
+    ``numpy.random.Generator`` as ``rng`` for reproducible draws.
+    """
+
+    missing = pandas.isnull(vals)
+    n_values = (~missing).sum(axis=1)
+
+    # sort the non-missing values to the front of each row
+    order = np.argsort(missing, axis=1, kind='stable')
+
+    if rng is None:
+        rng = np.random.default_rng()
+    draw = np.floor(
+        rng.random(vals.shape[0]) * np.maximum(n_values, 1)
+    ).astype(np.int64)
+
+    columns = np.take_along_axis(order, draw[:, None], axis=1)
+    result = np.take_along_axis(vals, columns, axis=1).ravel()
+
+    return _mask_missing(result, n_values == 0)
+
+
+def _metadata_order(vals, meta):
+    """Return the metadata as floats, with invalid entries flagged.
+
+    Entries with a missing value or missing metadata are invalid and
+    must not be chosen. Numeric and datetime metadata is viewed as
+    float64 directly; other orderable metadata is ranked per row with
+    pandas.
+    """
+
+    invalid = pandas.isnull(vals) | pandas.isnull(meta)
+
+    try:
+        order = meta.astype(np.float64)
+    except (TypeError, ValueError):
+        order = pandas.DataFrame(meta).rank(axis=1).to_numpy()
+
+    return order, invalid
+
+
+@vectorized
+def choose_metadata_max_vec(vals, meta):
+    """Choose the value with the largest metadata value per record pair.
+
+    Vectorized version of :func:`choose_metadata_max`.
+    """
+
+    order, invalid = _metadata_order(vals, meta)
+
+    index = np.argmax(np.where(invalid, -np.inf, order), axis=1)
+    result = np.take_along_axis(vals, index[:, None], axis=1).ravel()
+
+    return _mask_missing(result, invalid.all(axis=1))
+
+
+@vectorized
+def choose_metadata_min_vec(vals, meta):
+    """Choose the value with the smallest metadata value per record pair.
+
+    Vectorized version of :func:`choose_metadata_min`.
+    """
+
+    order, invalid = _metadata_order(vals, meta)
+
+    index = np.argmin(np.where(invalid, np.inf, order), axis=1)
+    result = np.take_along_axis(vals, index[:, None], axis=1).ravel()
+
+    return _mask_missing(result, invalid.all(axis=1))
+
+
+@vectorized
+def choose_vec(vals, meta, trusted):
+    """Choose the first non-missing value of a trusted source.
+
+    Vectorized version of :func:`choose`. The metadata holds the source
+    identifier of each value column and may be given per record pair
+    (2-D) or once for all record pairs (1-D), in which case it is
+    broadcast against the value matrix.
+    """
+
+    meta = np.broadcast_to(np.asarray(meta, dtype=object), vals.shape)
+
+    candidates = (meta == trusted) & ~pandas.isnull(vals)
+    first = candidates.argmax(axis=1)
+
+    result = np.take_along_axis(vals, first[:, None], axis=1).ravel()
+
+    return _mask_missing(result, ~candidates.any(axis=1))
+
+
+@vectorized
+def count_vec(vals, meta=None):
+    """Count the number of unique non-missing values for each record pair.
+
+    Vectorized version of :func:`count`.
+    """
+
+    return pandas.DataFrame(vals).nunique(axis=1).to_numpy()
@@ -0,0 +1,792 @@
+"""Module for fusing the records of linked dataframes."""
+
+from __future__ import division
+
+import multiprocessing as mp
+
+import numpy as np
+import pandas
+
+from recordlinkage.utils import is_label_dataframe
+from recordlinkage.utils import listify
+
+from recordlinkage.algorithms.conflict_resolution import choose_max_vec
+from recordlinkage.algorithms.conflict_resolution import choose_metadata_max_vec
+from recordlinkage.algorithms.conflict_resolution import choose_metadata_min_vec
+from recordlinkage.algorithms.conflict_resolution import choose_min_vec
+from recordlinkage.algorithms.conflict_resolution import choose_random_vec
+from recordlinkage.algorithms.conflict_resolution import choose_vec
+from recordlinkage.algorithms.conflict_resolution import count_vec
+from recordlinkage.algorithms.conflict_resolution import no_gossip_vec
+from recordlinkage.algorithms.conflict_resolution import vote_vec
+
+from recordlinkage import rl_logging as logging
+
+
+def _transform_column(fun, column):
+    """Apply an elementwise transformation function to a column.
+
+    numpy ufuncs and functions marked with the ``vectorized`` attribute
+    are called directly on the array, so they transform the whole column
+    in one call. This makes it possible to reach compiled speed for
+    numeric transformations, for example by passing a ``numba.njit``
+    compiled function marked with
+    :func:`recordlinkage.algorithms.conflict_resolution.vectorized`.
+    Other callables are applied per element with ``numpy.vectorize``.
+    """
+
+    if isinstance(fun, np.ufunc) or getattr(fun, 'vectorized', False):
+        return fun(column)
+
+    return np.vectorize(fun, otypes=[object])(column)
+
+
+def _stack_arrays(arrays):
+    """Stack 1-D columns or 2-D side matrices into one 2-D matrix.
+
+    numpy's own stacking uses value-based promotion, which would for
+    example turn numbers into strings when numeric and string columns
+    are mixed, and silently push numeric resolution onto boxed Python
+    objects. Arrays with a common dtype, or dtypes that promote to a
+    common numeric dtype, are stacked natively so numeric kernels stay
+    on fast typed arrays. Anything else falls back to object dtype.
+    """
+
+    arrays = [arr[:, None] if arr.ndim == 1 else arr for arr in arrays]
+
+    dtypes = set(arr.dtype for arr in arrays)
+
+    if len(dtypes) == 1 or all(
+            np.issubdtype(dtype, np.number) for dtype in dtypes):
+        return np.hstack(arrays)
+
+    n_rows = arrays[0].shape[0]
+    n_cols = sum(arr.shape[1] for arr in arrays)
+
+    matrix = np.empty((n_rows, n_cols), dtype=object)
+
+    start = 0
+    for arr in arrays:
+        matrix[:, start:start + arr.shape[1]] = arr
+        start += arr.shape[1]
+
+    return matrix
+
+
+def _resolve_worker(fun, data, params):
+    """Resolve the conflicts of one resolution job.
+
+    This is a module level function so that it pickles cleanly for
+    multiprocessing workers.
+    """
+
+    if getattr(fun, 'vectorized', False):
+
+        if data.meta is not None:
+            meta = data.meta
+        else:
+            # static metadata broadcasts against the value matrix
+            meta = data.static_meta
+
+        return fun(data.values, meta, *params)
+
+    return data.to_series().apply(fun, args=params).to_numpy()
+
+
+class ResolutionMatrix(object):
+    """Container for the data of one conflict resolution job.
+
+    The values and the optional metadata of all record pairs are stored
+    as 2-D numpy arrays of shape ``(n_pairs, n_columns)``, one column per
+    input column. This keeps the data contiguous for the vectorized
+    conflict resolution functions.
+
+    Static metadata (for example source identifiers) is identical for
+    each record pair, so it is stored once as a tuple with one value per
+    column instead of a full matrix.
+    """
+
+    def __init__(self, values, meta=None, static_meta=None):
+
+        self.values = values
+        self.meta = meta
+        self.static_meta = static_meta
+
+    def to_series(self):
+        """Return the data as a pandas Series of nested tuples.
+
+        Each element is a nested tuple ``(values, metadata)`` for one
+        record pair, as consumed by the row-wise conflict resolution
+        functions.
+        """
+
+        # tuple rows come straight from the stacked matrices; this is
+        # considerably faster than zipping the columns in Python
+        value_rows = map(tuple, self.values)
+
+        if self.meta is not None:
+            meta_rows = map(tuple, self.meta)
+            return pandas.Series(list(zip(value_rows, meta_rows)))
+
+        if self.static_meta is not None:
+            return pandas.Series(
+                [(values, self.static_meta) for values in value_rows])
+
+        return pandas.Series([(values, None) for values in value_rows])
+
+
+class FuseCore(object):
+    """Base class for fusing classes in the Python Record Linkage Toolkit.
+
+    The structure of the fusing classes follows the framework of the
+    ``Compare`` class. Conflict resolution jobs are queued with the
+    resolution methods and executed with the ``fuse`` method.
+
+    Parameters
+    ----------
+    random_state : int, numpy.random.Generator, optional
+        Seed for the random conflict resolution functions. Use for
+        reproducible results.
+    """
+
+    def __init__(self, random_state=None):
+        super(FuseCore, self).__init__()
+
+        self.random_state = random_state
+        self._rng = np.random.default_rng(random_state)
+
+        self.vectors = None
+        self.index_left = None
+        self.index_right = None
+        self.predictions = None
+        self.df_a = None
+        self.df_b = None
+
+        self.resolution_queue = []
+
+        self._column_cache = {}
+        self._transform_cache = {}
+
+    def resolve_custom(self, fun, values_a, values_b, meta_a=None,
+                       meta_b=None, transform_vals=None, transform_meta=None,
+                       static_meta=False, params=(), name=None):
+        """Queue a custom conflict resolution function.
+
+        The function is called for each record pair with a nested tuple
+        ``(values, metadata)``, unless it is marked as vectorized (see
+        :func:`recordlinkage.algorithms.conflict_resolution.vectorized`),
+        in which case it is called once with 2-D numpy arrays.
+
+        Parameters
+        ----------
+        fun : function
+            A conflict resolution function.
+        values_a : label, list of labels
+            The columns of the first dataframe to resolve.
+        values_b : label, list of labels
+            The columns of the second dataframe to resolve.
+        meta_a : label, list of labels, optional
+            The columns of the first dataframe to use as metadata.
+        meta_b : label, list of labels, optional
+            The columns of the second dataframe to use as metadata.
+        transform_vals : function, optional
+            A function to transform the values before resolution. numpy
+            ufuncs and functions marked as vectorized are applied to
+            whole columns at once, other callables per element.
+        transform_meta : function, optional
+            A function to transform the metadata before resolution.
+        static_meta : bool
+            If True, meta_a and meta_b are static metadata values instead
+            of column labels. Default False.
+        params : tuple
+            Additional arguments to pass to the resolution function.
+        name : label, optional
+            The name of the resolved column.
+        """
+
+        return self._queue_resolve(
+            fun, values_a, values_b, meta_a=meta_a, meta_b=meta_b,
+            transform_vals=transform_vals, transform_meta=transform_meta,
+            static_meta=static_meta, params=params, name=name)
+
+    def _queue_resolve(self, fun, values_a, values_b, meta_a=None,
+                       meta_b=None, transform_vals=None, transform_meta=None,
+                       static_meta=False, params=(), name=None):
+        """Add a conflict resolution job to the resolution queue."""
+
+        self.resolution_queue.append({
+            'fun': fun,
+            'values_a': values_a,
+            'values_b': values_b,
+            'meta_a': meta_a,
+            'meta_b': meta_b,
+            'transform_vals': transform_vals,
+            'transform_meta': transform_meta,
+            'static_meta': static_meta,
+            'params': params,
+            'name': name
+        })
+
+        return self
+
+    def resolve(self, fun, data, params=()):
+        """Resolve the conflicts in a resolution series.
+
+        Vectorized resolution functions get the value and metadata
+        matrices directly. Other functions are applied row by row with
+        ``pandas.Series.apply``.
+
+        Parameters
+        ----------
+        fun : function
+            A conflict resolution function.
+        data : ResolutionMatrix
+            The values and metadata of the record pairs to resolve.
+        params : tuple
+            Additional arguments to pass to the resolution function.
+
+        Returns
+        -------
+        pandas.Series
+            A pandas Series with the resolved values.
+        """
+
+        return pandas.Series(_resolve_worker(fun, data, params))
+
+    def _fusion_init(self, vectors, df_a, df_b, predictions):
+        """Store the data to fuse on the fusion object."""
+
+        self.vectors = vectors
+        # the record pair labels as plain numpy arrays, one for each
+        # level of the MultiIndex
+        self.index_left = vectors.index.get_level_values(0).to_numpy()
+        self.index_right = vectors.index.get_level_values(1).to_numpy()
+        self.predictions = predictions
+        self.df_a = df_a
+        self.df_b = df_b
+
+        # The integer positions of the record pairs in df_a and df_b. The
+        # positions are computed once and reused to gather the columns of
+        # each resolution job with ndarray.take.
+        self._pos_a = df_a.index.get_indexer(self.index_left)
+        self._pos_b = df_b.index.get_indexer(self.index_right)
+
+        # get_indexer returns -1 for labels that are not found, which
+        # ndarray.take would silently wrap to the last row
+        if (self._pos_a < 0).any():
+            raise KeyError(
+                "record pair labels not found in the first dataframe")
+
+        if (self._pos_b < 0).any():
+            raise KeyError(
+                "record pair labels not found in the second dataframe")
+
+        if predictions is not None:
+
+            # Keep only the record pairs predicted to be matches. The
+            # boolean mask is applied to the cached positions once, so
+            # all later gathers see only the kept pairs.
+            mask = np.asarray(predictions, dtype=bool)
+
+            self.index_left = self.index_left[mask]
+            self.index_right = self.index_right[mask]
+            self._pos_a = self._pos_a[mask]
+            self._pos_b = self._pos_b[mask]
+            self._output_index = vectors.index[mask]
+
+        else:
+            self._output_index = vectors.index
+
+        self._column_cache = {}
+        self._transform_cache = {}
+
+    def _get_column(self, side, name):
+        """Return the gathered column of df_a ('a') or df_b ('b').
+
+        Each unique column is gathered once per fuse() call and shared by
+        all resolution jobs that use it.
+        """
+
+        try:
+            return self._column_cache[(side, name)]
+        except KeyError:
+
+            if side == 'a':
+                column = self.df_a[name].values.take(self._pos_a)
+            else:
+                column = self.df_b[name].values.take(self._pos_b)
+
+            self._column_cache[(side, name)] = column
+
+            return column
+
+    def _get_transformed_column(self, side, name, transform):
+        """Return the gathered column with a transformation applied.
+
+        Transformed columns are cached per fuse() call, so jobs that
+        apply the same transformation to the same column pay its cost
+        only once.
+        """
+
+        if transform is None:
+            return self._get_column(side, name)
+
+        key = (side, name, id(transform))
+
+        try:
+            return self._transform_cache[key]
+        except KeyError:
+
+            column = _transform_column(
+                transform, self._get_column(side, name))
+
+            self._transform_cache[key] = column
+
+            return column
+
+    def _validate_queue(self):
+        """Validate and normalize the jobs in the resolution queue.
+
+        Listification, callable checks and the generalization flags are
+        computed once per fuse() call. The normalized fields are stored
+        on the job dicts (underscored keys) and consumed by
+        _make_resolution_series without re-validation.
+        """
+
+        for position, job in enumerate(self.resolution_queue):
+
+            if not callable(job['fun']):
+                raise ValueError("resolution function is not callable")
+
+            for key in ('transform_vals', 'transform_meta'):
+                if job[key] is not None and not callable(job[key]):
+                    raise ValueError("%s is not callable" % key)
+
+            values_a = listify(job['values_a'])
+            values_b = listify(job['values_b'])
+
+            # an empty side would only surface later, as an opaque
+            # error when the value matrices are stacked
+            if not values_a or not values_b:
+                label = job['name'] if job['name'] is not None \
+                    else position
+                raise ValueError(
+                    "resolution job %r has no value columns for the %s "
+                    "dataframe" % (
+                        label, "first" if not values_a else "second"))
+
+            if job['static_meta']:
+                meta_a = []
+                meta_b = []
+            else:
+                meta_a = listify(job['meta_a']) \
+                    if job['meta_a'] is not None else []
+                meta_b = listify(job['meta_b']) \
+                    if job['meta_b'] is not None else []
+
+            # check requested labels (for better error messages)
+            if not is_label_dataframe(values_a + meta_a, self.df_a):
+                raise KeyError("label is not found in the first dataframe")
+
+            if not is_label_dataframe(values_b + meta_b, self.df_b):
+                raise KeyError("label is not found in the second dataframe")
+
+            job['_values_a'] = values_a
+            job['_values_b'] = values_b
+            job['_meta_a'] = meta_a
+            job['_meta_b'] = meta_b
+
+            job['_use_meta'] = bool(
+                job['static_meta'] or meta_a or meta_b)
+
+            # a single value (or metadata) column combined with multiple
+            # metadata (or value) columns is generalized by replication
+            job['_generalize_values_a'] = (
+                len(values_a) == 1 and len(meta_a) > 1)
+            job['_generalize_values_b'] = (
+                len(values_b) == 1 and len(meta_b) > 1)
+            job['_generalize_meta_a'] = (
+                len(meta_a) == 1 and len(values_a) > 1)
+            job['_generalize_meta_b'] = (
+                len(meta_b) == 1 and len(values_b) > 1)
+
+            # after generalization, the value and metadata matrices must
+            # end up with the same number of columns; anything else would
+            # fail later with an opaque broadcast error
+            if job['_use_meta'] and not job['static_meta']:
+
+                values_width = (
+                    (len(meta_a) if job['_generalize_values_a']
+                     else len(values_a)) +
+                    (len(meta_b) if job['_generalize_values_b']
+                     else len(values_b)))
+                meta_width = (
+                    (len(values_a) if job['_generalize_meta_a']
+                     else len(meta_a)) +
+                    (len(values_b) if job['_generalize_meta_b']
+                     else len(meta_b)))
+
+                if values_width != meta_width:
+                    label = job['name'] if job['name'] is not None \
+                        else position
+                    raise ValueError(
+                        "resolution job %r has %d value columns but %d "
+                        "metadata columns" % (
+                            label, values_width, meta_width))
+
+    def _make_side_matrix(self, side, names, repeat=None, transform=None):
+        """Gather and stack the columns of one side into a matrix.
+
+        When ``repeat`` is given, the single column in ``names`` is
+        generalized to ``repeat`` identical columns with a zero-copy
+        broadcast view instead of replicated copies. Transformations are
+        applied per unique column, before any replication. Returns None
+        when there are no columns to stack.
+        """
+
+        if not names:
+            return None
+
+        if repeat is not None:
+
+            column = self._get_transformed_column(side, names[0], transform)
+
+            return np.broadcast_to(
+                column[:, None], (column.shape[0], repeat))
+
+        return _stack_arrays([
+            self._get_transformed_column(side, name, transform)
+            for name in names
+        ])
+
+    def _materialize_columns(self):
+        """Gather all columns used by the resolution queue in one pass."""
+
+        for job in self.resolution_queue:
+
+            for name in job['_values_a'] + job['_meta_a']:
+                self._get_column('a', name)
+
+            for name in job['_values_b'] + job['_meta_b']:
+                self._get_column('b', name)
+
+    def _make_resolution_series(self, job):
+        """Make a resolution matrix for one conflict resolution job.
+
+        The job dict is expected to be normalized by _validate_queue.
+        Returns a ResolutionMatrix with the values and metadata of all
+        record pairs. The metadata is None if the job does not use
+        metadata.
+        """
+
+        values_a = job['_values_a']
+        values_b = job['_values_b']
+        meta_a_list = job['_meta_a']
+        meta_b_list = job['_meta_b']
+
+        transform_vals = job['transform_vals']
+        transform_meta = job['transform_meta']
+
+        vals_a = self._make_side_matrix(
+            'a', values_a,
+            repeat=len(meta_a_list) if job['_generalize_values_a'] else None,
+            transform=transform_vals)
+        vals_b = self._make_side_matrix(
+            'b', values_b,
+            repeat=len(meta_b_list) if job['_generalize_values_b'] else None,
+            transform=transform_vals)
+
+        vals = _stack_arrays([vals_a, vals_b])
+
+        if job['static_meta']:
+
+            # meta_a and meta_b are static values (for example source
+            # identifiers), identical for each record pair. They are
+            # stored once per column instead of per record pair.
+            meta_tuple = tuple(
+                [job['meta_a']] * vals_a.shape[1] +
+                [job['meta_b']] * vals_b.shape[1])
+
+            return ResolutionMatrix(vals, static_meta=meta_tuple)
+
+        if job['_use_meta']:
+
+            meta_a_mat = self._make_side_matrix(
+                'a', meta_a_list,
+                repeat=len(values_a) if job['_generalize_meta_a'] else None,
+                transform=transform_meta)
+            meta_b_mat = self._make_side_matrix(
+                'b', meta_b_list,
+                repeat=len(values_b) if job['_generalize_meta_b'] else None,
+                transform=transform_meta)
+
+            sides = [m for m in (meta_a_mat, meta_b_mat) if m is not None]
+            meta = sides[0] if len(sides) == 1 else _stack_arrays(sides)
+
+            return ResolutionMatrix(vals, meta=meta)
+
+        return ResolutionMatrix(vals)
+
+    def _job_params(self, job):
+        """Return the parameters of a job, with a per-job generator.
+
+        The random number generator queued by the random resolution
+        methods is replaced by an independent child generator spawned
+        per job. Pickled tasks would otherwise carry copies of the same
+        generator state, making the draws of multiple random jobs
+        identical and the results depend on n_jobs.
+        """
+
+        return tuple(
+            self._rng.spawn(1)[0] if param is self._rng else param
+            for param in job['params'])
+
+    def _fuse_arrays(self, vectors, df_a, df_b, predictions=None, n_jobs=1):
+        """Run the resolution queue on numpy arrays.
+
+        Executes all queued conflict resolution jobs and returns the
+        output names and the resolved column arrays, without wrapping
+        them in pandas objects.
+        """
+
+        self._fusion_init(vectors, df_a, df_b, predictions)
+
+        logging.info(
+            "Fusing - start fusing %d resolution jobs"
+            % len(self.resolution_queue)
+        )
+
+        try:
+
+            # Validate and normalize the whole queue once, then gather
+            # each unique column once, shared by all jobs.
+            self._validate_queue()
+            self._materialize_columns()
+
+            if n_jobs == 1:
+                # build the matrices of each job right before resolving
+                # it, so only one job's matrices are resident at a time
+                results = [
+                    _resolve_worker(
+                        job['fun'],
+                        self._make_resolution_series(job),
+                        self._job_params(job))
+                    for job in self.resolution_queue
+                ]
+            else:
+
+                tasks = [
+                    (job['fun'],
+                     self._make_resolution_series(job),
+                     self._job_params(job))
+                    for job in self.resolution_queue
+                ]
+
+                # prefer fork, it avoids re-importing the package in
+                # every worker (starmap pickles the task matrices
+                # regardless of the start method)
+                if 'fork' in mp.get_all_start_methods():
+                    ctx = mp.get_context('fork')
+                else:
+                    ctx = mp.get_context()
+
+                pool_size = n_jobs if n_jobs > 0 else None
+
+                with ctx.Pool(pool_size) as pool:
+                    results = pool.starmap(_resolve_worker, tasks)
+
+        finally:
+            # do not hold gathered or transformed columns across fuse()
+            # calls
+            self._column_cache = {}
+            self._transform_cache = {}
+
+        names = [
+            job['name'] if job['name'] is not None else i
+            for i, job in enumerate(self.resolution_queue)
+        ]
+
+        return names, results
+
+    def fuse_numpy(self, vectors, df_a, df_b, predictions=None, n_jobs=1):
+        """Fuse the records of two linked dataframes into numpy arrays.
+
+        Same as :meth:`fuse`, but returns the resolved columns as plain
+        numpy arrays and skips the construction of the output DataFrame.
+        Useful when the result feeds numpy or scikit-learn directly.
+
+        Returns
+        -------
+        dict
+            A dict mapping the output name of each queued conflict
+            resolution job to a numpy array with the resolved values.
+        """
+
+        names, results = self._fuse_arrays(
+            vectors, df_a, df_b, predictions=predictions, n_jobs=n_jobs)
+
+        if len(set(names)) != len(names):
+            raise ValueError(
+                "resolution queue has duplicate output names")
+
+        return dict(zip(names, results))
+
+    def fuse(self, vectors, df_a, df_b, predictions=None, n_jobs=1):
+        """Fuse the records of two linked dataframes.
+
+        Calling this method executes the queued conflict resolution jobs.
+
+        Parameters
+        ----------
+        vectors : pandas.DataFrame
+            The comparison vectors, indexed by a pandas MultiIndex with the
+            record pairs to fuse.
+        df_a : pandas.DataFrame
+            The first dataframe.
+        df_b : pandas.DataFrame
+            The second dataframe.
+        predictions : pandas.Series, optional
+            A pandas Series with the predicted matches.
+        n_jobs : int
+            The number of worker processes to resolve the jobs in the
+            queue with. The jobs are independent, so they parallelize
+            well. Use -1 for all available cores. Default 1.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A pandas DataFrame with one fused column for each queued
+            conflict resolution job.
+        """
+
+        names, results = self._fuse_arrays(
+            vectors, df_a, df_b, predictions=predictions, n_jobs=n_jobs)
+
+        if len(set(names)) == len(names):
+            # build the output frame in one shot from the resolved
+            # arrays, without intermediate one-column frames
+            return pandas.DataFrame(
+                dict(zip(names, results)), index=self._output_index)
+
+        # duplicate output names, fall back to concatenation
+        fused = []
+
+        for name, result in zip(names, results):
+            series = pandas.Series(result, index=self._output_index)
+            series.name = name
+            fused.append(series)
+
+        return pandas.concat(fused, axis=1)
+
+
+class FuseLinks(FuseCore):
+    """Class to fuse the records of two linked dataframes.
+
+    Class to combine the records of two linked dataframes into a single
+    dataframe, resolving conflicts between the values of the records with
+    conflict resolution functions.
+
+    Example
+    -------
+    Consider two dataframes ``df_a`` and ``df_b`` that are linked with the
+    record pairs in ``matches`` and compared in ``vectors``:
+
+    >>> fuse = recordlinkage.FuseLinks()
+    >>> fuse.trust_your_friends('age', 'age', trusted='a')
+    >>> fuse.no_gossiping('postcode', 'zipcode', name='postcode')
+    >>> fuse.fuse(vectors, df_a, df_b)
+    """
+
+    def trust_your_friends(self, values_a, values_b, trusted='a', name=None):
+        """Choose the value of the trusted source.
+
+        Parameters
+        ----------
+        values_a : label, list of labels
+            The columns of the first dataframe to resolve.
+        values_b : label, list of labels
+            The columns of the second dataframe to resolve.
+        trusted : 'a' or 'b'
+            The trusted source. Default 'a'.
+        name : label, optional
+            The name of the resolved column.
+        """
+
+        return self._queue_resolve(
+            choose_vec, values_a, values_b, meta_a='a', meta_b='b',
+            static_meta=True, params=(trusted,), name=name)
+
+    def no_gossiping(self, values_a, values_b, name=None):
+        """Choose the value on which both sources agree.
+
+        If the values disagree, or if one of the values is missing, the
+        fused value is missing.
+        """
+
+        return self._queue_resolve(
+            no_gossip_vec, values_a, values_b, name=name)
+
+    def cry_with_the_wolves(self, values_a, values_b, name=None):
+        """Choose the most common value."""
+
+        return self._queue_resolve(vote_vec, values_a, values_b, name=name)
+
+    def roll_the_dice(self, values_a, values_b, name=None):
+        """Choose a random value.
+
+        Seed the fusing object with ``random_state`` for reproducible
+        draws.
+        """
+
+        return self._queue_resolve(
+            choose_random_vec, values_a, values_b,
+            params=(self._rng,), name=name)
+
+    def keep_up_to_date(self, values_a, values_b, dates_a, dates_b,
+                        name=None):
+        """Choose the most recent value.
+
+        Parameters
+        ----------
+        values_a : label, list of labels
+            The columns of the first dataframe to resolve.
+        values_b : label, list of labels
+            The columns of the second dataframe to resolve.
+        dates_a : label, list of labels
+            The columns of the first dataframe with the dates of the
+            values.
+        dates_b : label, list of labels
+            The columns of the second dataframe with the dates of the
+            values.
+        name : label, optional
+            The name of the resolved column.
+        """
+
+        return self._queue_resolve(
+            choose_metadata_max_vec, values_a, values_b, meta_a=dates_a,
+            meta_b=dates_b, name=name)
+
+    def keep_out_of_date(self, values_a, values_b, dates_a, dates_b,
+                         name=None):
+        """Choose the oldest value."""
+
+        return self._queue_resolve(
+            choose_metadata_min_vec, values_a, values_b, meta_a=dates_a,
+            meta_b=dates_b, name=name)
+
+    def maximum(self, values_a, values_b, name=None):
+        """Choose the largest value."""
+
+        return self._queue_resolve(
+            choose_max_vec, values_a, values_b, name=name)
+
+    def minimum(self, values_a, values_b, name=None):
+        """Choose the smallest value."""
+
+        return self._queue_resolve(
+            choose_min_vec, values_a, values_b, name=name)
+
+    def count_unique(self, values_a, values_b, name=None):
+        """Count the number of unique non-missing values."""
+
+        return self._queue_resolve(count_vec, values_a, values_b, name=name)
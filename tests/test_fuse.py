@@ -0,0 +1,451 @@
+import unittest
+
+import recordlinkage
+
+import numpy as np
+from numpy import nan
+import pandas as pd
+
+import numpy.testing as npt
+
+
+class TestFuseData(unittest.TestCase):
+    """Unittest object to setup test data."""
+
+    @classmethod
+    def setUpClass(cls):
+
+        cls.a = pd.DataFrame({
+            'given_name': ['ronald', 'amy', 'andrew', 'william', 'frank'],
+            'age': [23, 40, 70, 45, 23],
+            'income': [1200, 3400, 2100, nan, 2300],
+            'updated': [2010, 2012, 2014, 2016, 2018],
+            'date': pd.to_datetime([
+                '2010-01-15', '2012-05-02', '2015-02-01', '2016-11-30',
+                '2018-07-07'])
+        }, index=['a_%s' % i for i in range(5)])
+
+        cls.b = pd.DataFrame({
+            'name': ['ronald', 'amy', 'andy', 'william', 'frank'],
+            'age': [23, 41, 70, 45, 23],
+            'income': [1300, 3400, 2000, 2500, nan],
+            'updated': [2011, 2011, 2015, 2015, 2017],
+            'date': pd.to_datetime([
+                '2011-06-15', None, '2015-02-01', '2015-01-01',
+                '2017-03-03'])
+        }, index=['b_%s' % i for i in range(5)])
+
+        pairs = [('a_%s' % i, 'b_%s' % i) for i in range(5)]
+        cls.pairs = pd.MultiIndex.from_tuples(pairs)
+
+        cls.vectors = pd.DataFrame(
+            {'score': [1, 1, 0, 1, 1]}, index=cls.pairs)
+
+
+class TestFuseLinks(TestFuseData):
+
+    def test_trust_your_friends(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.trust_your_friends('age', 'age', trusted='a', name='age')
+        fuse.trust_your_friends('age', 'age', trusted='b', name='age_b')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['age'].values, self.a['age'].values)
+        npt.assert_array_equal(
+            result['age_b'].values, self.b['age'].values)
+
+    def test_no_gossiping(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.no_gossiping('age', 'age', name='age')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['age'].astype(np.float64).values,
+            np.array([23, nan, 70, 45, 23]))
+
+    def test_trust_your_friends_datetime(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.trust_your_friends('date', 'date', trusted='b', name='date')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['date'].values, self.b['date'].values)
+
+    def test_no_gossiping_datetime(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.no_gossiping('date', 'date', name='date')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['date'].values,
+            pd.to_datetime(
+                [None, None, '2015-02-01', None, None]).values)
+
+    def test_cry_with_the_wolves(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.cry_with_the_wolves(
+            ['given_name', 'given_name'], 'name', name='name')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['name'].values, self.a['given_name'].values)
+
+    def test_roll_the_dice(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.roll_the_dice('income', 'income', name='income')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        for i, value in enumerate(result['income'].values):
+            candidates = [
+                self.a['income'].iloc[i], self.b['income'].iloc[i]
+            ]
+            self.assertIn(value, candidates)
+            self.assertFalse(pd.isnull(value))
+
+    def test_roll_the_dice_datetime(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.roll_the_dice('date', 'date', name='date')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        for i, value in enumerate(result['date'].values):
+            self.assertFalse(pd.isnull(value))
+            self.assertIn(
+                value, [self.a['date'].iloc[i], self.b['date'].iloc[i]])
+
+    def test_roll_the_dice_random_state(self):
+
+        results = []
+
+        for _ in range(2):
+            fuse = recordlinkage.FuseLinks(random_state=42)
+            fuse.roll_the_dice('age', 'age', name='age')
+            results.append(fuse.fuse(self.vectors, self.a, self.b))
+
+        npt.assert_array_equal(
+            results[0]['age'].values, results[1]['age'].values)
+
+    def test_roll_the_dice_n_jobs(self):
+
+        results = []
+
+        for n_jobs in [1, 2]:
+            fuse = recordlinkage.FuseLinks(random_state=7)
+            fuse.roll_the_dice('age', 'age', name='age')
+            fuse.roll_the_dice('income', 'income', name='income')
+            results.append(
+                fuse.fuse(self.vectors, self.a, self.b, n_jobs=n_jobs))
+
+        npt.assert_array_equal(
+            results[0].astype(np.float64).values,
+            results[1].astype(np.float64).values)
+
+    def test_keep_up_to_date(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.keep_up_to_date(
+            'income', 'income', 'updated', 'updated', name='income')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['income'].values,
+            np.array([1300, 3400, 2000, 2500, 2300]))
+
+    def test_keep_up_to_date_datetime_metadata(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.keep_up_to_date(
+            'income', 'income', 'date', 'date', name='income')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['income'].values,
+            np.array([1300, 3400, 2100, 2500, 2300]))
+
+    def test_keep_up_to_date_datetime_values(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.keep_up_to_date(
+            'date', 'date', 'updated', 'updated', name='date')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['date'].values,
+            pd.to_datetime([
+                '2011-06-15', '2012-05-02', '2015-02-01', '2016-11-30',
+                '2018-07-07']).values)
+
+    def test_keep_up_to_date_generalized(self):
+
+        # one value column of df_a generalized over two metadata columns
+        fuse = recordlinkage.FuseLinks()
+        fuse.keep_up_to_date(
+            'income', 'income', ['age', 'updated'], 'updated',
+            name='income')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['income'].values,
+            np.array([1300, 3400, 2000, 2500, 2300]))
+
+    def test_maximum_minimum(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'age', name='age_max')
+        fuse.minimum('age', 'age', name='age_min')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['age_max'].values, np.array([23, 41, 70, 45, 23]))
+        npt.assert_array_equal(
+            result['age_min'].values, np.array([23, 40, 70, 45, 23]))
+
+    def test_maximum_missing(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('income', 'income', name='income')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['income'].values,
+            np.array([1300, 3400, 2100, 2500, 2300]))
+
+    def test_maximum_strings(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('given_name', 'name', name='name')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['name'].values,
+            np.array(['ronald', 'amy', 'andy', 'william', 'frank']))
+
+    def test_maximum_minimum_datetime(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('date', 'date', name='date_max')
+        fuse.minimum('date', 'date', name='date_min')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['date_max'].values,
+            pd.to_datetime([
+                '2011-06-15', '2012-05-02', '2015-02-01', '2016-11-30',
+                '2018-07-07']).values)
+        npt.assert_array_equal(
+            result['date_min'].values,
+            pd.to_datetime([
+                '2010-01-15', '2012-05-02', '2015-02-01', '2015-01-01',
+                '2017-03-03']).values)
+
+    def test_maximum_large_integers(self):
+
+        # int64 values above 2**53 must not pass through float64
+        a = pd.DataFrame(
+            {'id': [2 ** 60 + 1, 5]}, index=['a_0', 'a_1'])
+        b = pd.DataFrame(
+            {'id': [2 ** 60, 6]}, index=['b_0', 'b_1'])
+        pairs = pd.MultiIndex.from_tuples(
+            [('a_0', 'b_0'), ('a_1', 'b_1')])
+        vectors = pd.DataFrame({'score': [1, 1]}, index=pairs)
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('id', 'id', name='id')
+
+        result = fuse.fuse(vectors, a, b)
+
+        self.assertEqual(result['id'].dtype, np.int64)
+        npt.assert_array_equal(
+            result['id'].values, np.array([2 ** 60 + 1, 6]))
+
+    def test_count_unique(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.count_unique('age', 'age', name='n_age')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['n_age'].values, np.array([1, 2, 1, 1, 1]))
+
+    def test_resolve_custom(self):
+
+        def resolve_mean(x):
+            return np.mean(x[0])
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.resolve_custom(resolve_mean, 'age', 'age', name='age')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['age'].values, np.array([23, 40.5, 70, 45, 23]))
+
+    def test_transform_vals(self):
+
+        from recordlinkage.algorithms.conflict_resolution import \
+            choose_max_vec
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.resolve_custom(
+            choose_max_vec, 'age', 'age',
+            transform_vals=lambda x: x * 2, name='age_py')
+        fuse.resolve_custom(
+            choose_max_vec, 'age', 'age',
+            transform_vals=np.negative, name='age_ufunc')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['age_py'].values, np.array([46, 82, 140, 90, 46]))
+        npt.assert_array_equal(
+            result['age_ufunc'].values, np.array([-23, -40, -70, -45, -23]))
+
+    def test_output_index_and_names(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'age')
+        fuse.minimum('age', 'age')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        self.assertTrue(result.index.equals(self.vectors.index))
+        self.assertEqual(list(result.columns), [0, 1])
+
+    def test_fuse_n_jobs(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'age', name='age_max')
+        fuse.no_gossiping('age', 'age', name='age')
+        fuse.trust_your_friends('income', 'income', trusted='a',
+                                name='income')
+
+        serial = fuse.fuse(self.vectors, self.a, self.b)
+        parallel = fuse.fuse(self.vectors, self.a, self.b, n_jobs=2)
+
+        npt.assert_array_equal(
+            serial.astype(np.float64).values,
+            parallel.astype(np.float64).values)
+
+    def test_mixed_dtypes(self):
+
+        from recordlinkage.algorithms.conflict_resolution import vectorized
+
+        @vectorized
+        def first_column(vals, meta):
+            return vals[:, 0]
+
+        # mixing numeric and string columns must not stringify the
+        # numeric values
+        fuse = recordlinkage.FuseLinks()
+        fuse.resolve_custom(first_column, 'age', 'name', name='age')
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        npt.assert_array_equal(
+            result['age'].values, self.a['age'].values)
+
+    def test_predictions(self):
+
+        predictions = pd.Series(
+            [True, True, False, True, False], index=self.pairs)
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'age', name='age')
+
+        result = fuse.fuse(
+            self.vectors, self.a, self.b, predictions=predictions)
+
+        self.assertTrue(result.index.equals(self.pairs[[0, 1, 3]]))
+        npt.assert_array_equal(
+            result['age'].values, np.array([23, 41, 45]))
+
+    def test_unknown_label(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'not_a_label')
+
+        with self.assertRaises(KeyError):
+            fuse.fuse(self.vectors, self.a, self.b)
+
+    def test_empty_value_columns(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum([], 'age', name='age')
+
+        with self.assertRaises(ValueError):
+            fuse.fuse(self.vectors, self.a, self.b)
+
+    def test_mismatched_metadata_width(self):
+
+        # three value columns against four metadata columns, neither
+        # side generalizable
+        fuse = recordlinkage.FuseLinks()
+        fuse.keep_up_to_date(
+            ['age', 'income'], 'age',
+            ['age', 'income', 'updated'], 'updated', name='bad')
+
+        with self.assertRaises(ValueError):
+            fuse.fuse(self.vectors, self.a, self.b)
+
+    def test_unknown_pair_label(self):
+
+        pairs = pd.MultiIndex.from_tuples(
+            [('a_0', 'b_0'), ('not_a_record', 'b_1')])
+        vectors = pd.DataFrame({'score': [1, 1]}, index=pairs)
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'age', name='age')
+
+        with self.assertRaises(KeyError):
+            fuse.fuse(vectors, self.a, self.b)
+
+    def test_fuse_numpy(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'age', name='age_max')
+        fuse.minimum('age', 'age', name='age_min')
+
+        result = fuse.fuse_numpy(self.vectors, self.a, self.b)
+
+        self.assertIsInstance(result, dict)
+        self.assertIsInstance(result['age_max'], np.ndarray)
+
+        npt.assert_array_equal(
+            result['age_max'], np.array([23, 41, 70, 45, 23]))
+        npt.assert_array_equal(
+            result['age_min'], np.array([23, 40, 70, 45, 23]))
+
+    def test_resolution_queue(self):
+
+        fuse = recordlinkage.FuseLinks()
+        fuse.maximum('age', 'age')
+        fuse.no_gossiping('age', 'age')
+
+        self.assertEqual(len(fuse.resolution_queue), 2)
+
+        result = fuse.fuse(self.vectors, self.a, self.b)
+
+        self.assertEqual(result.shape, (len(self.pairs), 2))